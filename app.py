@@ -1,8 +1,8 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, g
-import sqlite3
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
 import functools
+import collections
 from werkzeug.security import generate_password_hash, check_password_hash
-from typing import Callable, Any, Union, Optional
+from typing import Callable, Any, Union, Optional, Sequence
 from werkzeug.wrappers import Response as WerkzeugResponse
 from flask.wrappers import Response as FlaskResponse
 from flask_wtf import FlaskForm
@@ -15,10 +15,15 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+import threading
+import time
 from dotenv import load_dotenv
 import logging
 from pathlib import Path
 
+from compression import CompressionMiddleware
+from storage import Storage, create_storage
+
 # 環境変数の読み込み
 load_dotenv()
 
@@ -44,6 +49,17 @@ if not IS_PRODUCTION and app.secret_key == 'your-secret-key-change-in-production
 app.config['WTF_CSRF_ENABLED'] = True
 app.config['WTF_CSRF_TIME_LIMIT'] = 3600  # 1時間（3600秒）
 
+# レスポンス圧縮の設定（gzip、brotliがインストールされていればbr）
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '500'))  # これ未満のバイト数は圧縮しない
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))  # gzipの圧縮レベル（1-9）
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '4'))  # brotliの品質（0-11）
+app.wsgi_app = CompressionMiddleware(
+    app.wsgi_app,
+    min_size=COMPRESS_MIN_SIZE,
+    level=COMPRESS_LEVEL,
+    brotli_quality=COMPRESS_BROTLI_QUALITY
+)
+
 # メール設定（環境変数から取得）
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', '587'))
@@ -76,87 +92,59 @@ if IS_PRODUCTION:
 else:
     DATABASE = 'perch_database.db'
 
-def get_db_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+# お問い合わせ種別・お客様区分の初期値: (保存するラベル, フォームの表示名)
+# ルックアップテーブルに登録され、以降はテーブルへの追加（active = TRUE）で選択肢を増やせる
+DEFAULT_GENRES = (
+    ('ご商談について', 'ご商談について'),
+    ('商品について', '商品について'),
+    ('その他について', 'その他'),
+)
+DEFAULT_USER_TYPES = (
+    ('はじめてのお客様', 'はじめてのお客様'),
+    ('お取引先様', 'お取引先様'),
+    ('その他', 'その他'),
+)
+LOOKUP_CACHE_SECONDS = float(os.getenv('LOOKUP_CACHE_SECONDS', '60'))
+LOOKUP_MISS_RELOAD_SECONDS = float(os.getenv('LOOKUP_MISS_RELOAD_SECONDS', '5'))  # 未知の値による読み直しの最短間隔
+
+# ストレージの選択（DATABASE_URLがPostgreSQLならそちらを使い、複数インスタンスで共有できる）
+DATABASE_URL = os.getenv('DATABASE_URL')
+storage: Storage = create_storage(DATABASE_URL, DATABASE)
 
-def create_default_admin(conn: sqlite3.Connection) -> None:
+def create_default_admin() -> None:
     """デフォルト管理者アカウントを作成する共通関数"""
     tokyo_tz = pytz.timezone('Asia/Tokyo')
     current_time_jst = datetime.datetime.now(tokyo_tz)
-    conn.execute(
-        '''INSERT INTO admin_users
-           (username, password_hash, email, security_question, security_answer_hash, created_at)
-           VALUES (?, ?, ?, ?, ?, ?)''',
-        (DEFAULT_ADMIN_USERNAME,
-         generate_password_hash(DEFAULT_ADMIN_PASSWORD),
-         DEFAULT_ADMIN_EMAIL,
-         DEFAULT_ADMIN_SECURITY_QUESTION,
-         generate_password_hash(DEFAULT_ADMIN_SECURITY_ANSWER),
-         current_time_jst)
+    storage.create_admin_user(
+        DEFAULT_ADMIN_USERNAME,
+        generate_password_hash(DEFAULT_ADMIN_PASSWORD),
+        DEFAULT_ADMIN_EMAIL,
+        DEFAULT_ADMIN_SECURITY_QUESTION,
+        generate_password_hash(DEFAULT_ADMIN_SECURITY_ANSWER),
+        current_time_jst
     )
     logger.info(f"デフォルト管理者アカウントを作成しました: {DEFAULT_ADMIN_USERNAME}")
 
-# データベース接続をgオブジェクトに格納する関数
-def get_db():
-    if 'db' not in g:
-        g.db = get_db_connection()
-    return g.db
-
-@app.teardown_appcontext
-def close_db(error: Optional[BaseException] = None) -> None:
-    db = g.pop('db', None)
-    if db is not None:
-        db.close()
+def seed_lookup_labels() -> None:
+    """お問い合わせ種別・お客様区分の初期値を登録（登録済みなら何もしない）"""
+    storage.add_lookup_labels('genres', DEFAULT_GENRES)
+    storage.add_lookup_labels('user_types', DEFAULT_USER_TYPES)
 
 def init_db() -> None:
     """データベースの初期化"""
     try:
-        logger.info(f"データベース初期化開始: {DATABASE}")
-        with sqlite3.connect(DATABASE) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS contacts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    email TEXT NOT NULL,
-                    phone TEXT,
-                    genre TEXT NOT NULL,
-                    user_type TEXT NOT NULL,
-                    message TEXT NOT NULL,
-                    created_at TIMESTAMP
-                )
-            ''')
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS admin_users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    security_question TEXT NOT NULL,
-                    security_answer_hash TEXT NOT NULL,
-                    created_at TIMESTAMP
-                )
-            ''')
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS password_reset_tokens (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    token TEXT UNIQUE NOT NULL,
-                    expires_at TIMESTAMP NOT NULL,
-                    used BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES admin_users (id)
-                )
-            ''')
-            
-            # デフォルト管理者アカウント
-            admin_count = conn.execute('SELECT COUNT(*) FROM admin_users').fetchone()[0]
-            if admin_count == 0:
-                create_default_admin(conn)
-            
-            conn.commit()
-            logger.info("データベース初期化完了")
+        logger.info(f"データベース初期化開始: {storage!r}")
+        storage.init_schema()
+
+        # 初期ラベルを先に登録してから、旧形式（genre・user_typeのテキスト列）を移行する
+        seed_lookup_labels()
+        storage.migrate_contact_lookups()
+
+        # デフォルト管理者アカウント
+        if storage.count_admin_users() == 0:
+            create_default_admin()
+
+        logger.info("データベース初期化完了")
     except Exception as e:
         logger.error(f"データベース初期化エラー: {e}")
         raise
@@ -164,41 +152,24 @@ def init_db() -> None:
 def ensure_db_initialized():
     """データベースの初期化を確実に実行"""
     try:
-        # データベースファイルの存在確認
-        if not os.path.exists(DATABASE):
-            logger.info(f"データベースファイルが存在しません: {DATABASE}")
+        # テーブル存在確認
+        if not storage.is_initialized():
+            logger.info("必要なテーブルが存在しません。データベースを初期化します")
             init_db()
             logger.info("データベースを初期化しました")
             return
-        
-        # テーブル存在確認
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        
-        # contactsテーブルの確認
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='contacts'")
-        contacts_exists = cursor.fetchone()
-        
-        # admin_usersテーブルの確認
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='admin_users'")
-        admin_exists = cursor.fetchone()
-        
-        if not contacts_exists or not admin_exists:
-            logger.info("必要なテーブルが存在しません。データベースを再初期化します")
-            conn.close()
-            init_db()
-        else:
-            # 管理者アカウントの存在確認
-            cursor.execute("SELECT COUNT(*) FROM admin_users")
-            admin_count = cursor.fetchone()[0]
-            if admin_count == 0:
-                logger.info("管理者アカウントが存在しません。作成します")
-                create_default_admin(conn)
-                conn.commit()
-            
-            conn.close()
-            logger.info("データベースは正常に初期化済みです")
-            
+
+        # 旧形式のテーブルが残っていれば移行する（移行済みなら何もしない）
+        seed_lookup_labels()
+        storage.migrate_contact_lookups()
+
+        # 管理者アカウントの存在確認
+        if storage.count_admin_users() == 0:
+            logger.info("管理者アカウントが存在しません。作成します")
+            create_default_admin()
+
+        logger.info("データベースは正常に初期化済みです")
+
     except Exception as e:
         logger.error(f"データベース確認・初期化エラー: {e}")
         try:
@@ -206,12 +177,200 @@ def ensure_db_initialized():
         except Exception as init_error:
             logger.error(f"データベース初期化の再試行も失敗: {init_error}")
 
+@app.teardown_appcontext
+def release_db(error: Optional[BaseException] = None) -> None:
+    storage.release()
+
 # アプリケーション起動時の必須初期化
 try:
     ensure_db_initialized()
     logger.info("=== アプリケーション初期化完了 ===")
 except Exception as e:
     logger.error(f"=== アプリケーション初期化エラー: {e} ===")
+finally:
+    # gunicorn --preload でワーカーに接続（PostgreSQLではプールのソケット）を引き継がないよう閉じておく
+    storage.release()
+    storage.close()
+
+class LookupCache:
+    """ルックアップテーブルの id↔ラベル 対応表（ワーカープロセスごとに保持）
+
+    LOOKUP_CACHE_SECONDS ごと、または未知のid・ラベルを引いた時にテーブルを読み直す。
+    未知の値での読み直しは miss_interval 秒に1回までとし、不正な入力が続いてもDBに負荷をかけない。
+    移行で取り込んだ旧データのラベル（active = FALSE）はidからは引けるが、
+    フォームの選択肢や入力値の検証には使わない。
+    """
+
+    def __init__(self, storage: Storage, table: str, ttl: float, miss_interval: float) -> None:
+        self.storage = storage
+        self.table = table
+        self.ttl = ttl
+        self.miss_interval = miss_interval
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._options: tuple[tuple[str, str], ...] = ()
+        self._labels: dict[int, str] = {}
+        self._ids: dict[str, int] = {}
+
+    def _load(self) -> None:
+        rows = self.storage.list_lookup(self.table)
+        self._options = tuple((label, display) for _, label, display, active in rows if active)
+        self._labels = {id_: label for id_, label, _, _ in rows}
+        self._ids = {label: id_ for id_, label, _, active in rows if active}
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self, miss: bool = False) -> None:
+        with self._lock:
+            max_age = self.miss_interval if miss else self.ttl
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= max_age:
+                self._load()
+
+    def options(self) -> tuple[tuple[str, str], ...]:
+        """フォームの選択肢 (ラベル, 表示名) を表示順に返す（有効なラベルのみ）"""
+        self._ensure_loaded()
+        return self._options
+
+    def label(self, id_: Optional[int]) -> Optional[str]:
+        self._ensure_loaded()
+        if id_ is not None and id_ not in self._labels:
+            self._ensure_loaded(miss=True)
+        return self._labels.get(id_)
+
+    def id_for(self, label: str) -> Optional[int]:
+        """有効なラベルのidを返す（無効・未登録ならNone）"""
+        self._ensure_loaded()
+        if label not in self._ids:
+            self._ensure_loaded(miss=True)
+        return self._ids.get(label)
+
+genre_lookup = LookupCache(storage, 'genres', LOOKUP_CACHE_SECONDS, LOOKUP_MISS_RELOAD_SECONDS)
+user_type_lookup = LookupCache(storage, 'user_types', LOOKUP_CACHE_SECONDS, LOOKUP_MISS_RELOAD_SECONDS)
+
+CONTACT_COLUMNS = ('id', 'name', 'email', 'phone', 'genre_id', 'user_type_id', 'message', 'created_at')
+
+class ContactRecord:
+    """読み取りモデル用のお問い合わせレコード（__slots__でメモリを節約）"""
+    __slots__ = CONTACT_COLUMNS
+
+    def __init__(self, row: Any) -> None:
+        for column in CONTACT_COLUMNS:
+            setattr(self, column, row[column])
+
+    @property
+    def genre(self) -> Optional[str]:
+        return genre_lookup.label(self.genre_id)
+
+    @property
+    def user_type(self) -> Optional[str]:
+        return user_type_lookup.label(self.user_type_id)
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {column: getattr(self, column) for column in CONTACT_COLUMNS}
+        data['genre'] = self.genre
+        data['user_type'] = self.user_type
+        return data
+
+class ContactReadModel:
+    """管理画面用の最近のお問い合わせの読み取りモデル（ワーカープロセスごとに保持）
+
+    新しい順に最大 window 件だけを保持する。ストレージの変更マーカー
+    （SQLiteでは PRAGMA data_version）が変化した時だけ id > last_seen の行を追加で読み込むため、
+    変更がなければ一覧・詳細表示でテーブルを読み直さない。
+    一覧は id の降順（＝受付順の新しい順）で、追加時に全件を並べ替えることはしない。
+    """
+
+    def __init__(self, storage: Storage, window: int) -> None:
+        self.storage = storage
+        self.window = window
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._marker: Any = None
+        self._last_seen = 0
+        self._total = 0
+        self._records: collections.deque[ContactRecord] = collections.deque(maxlen=window)
+        self._by_id: dict[int, ContactRecord] = {}
+        self._ordered: tuple[ContactRecord, ...] = ()
+
+    def _reset(self) -> None:
+        self._marker = None
+        self._last_seen = 0
+        self._total = 0
+        self._records = collections.deque(maxlen=self.window)
+        self._by_id = {}
+        self._ordered = ()
+
+    def _append(self, rows: list) -> None:
+        for row in rows[-self.window:]:
+            if len(self._records) == self._records.maxlen:
+                evicted = self._records.popleft()
+                self._by_id.pop(evicted.id, None)
+            record = ContactRecord(row)
+            self._records.append(record)
+            self._by_id[record.id] = record
+        if rows:
+            self._last_seen = rows[-1]['id']
+            self._ordered = tuple(reversed(self._records))
+
+    def _refresh(self) -> None:
+        # fork前に読み込んだ内容は使わず、ワーカーごとに読み込み直す
+        if self._pid != os.getpid():
+            self._reset()
+            self._pid = os.getpid()
+
+        marker = self.storage.change_marker()
+        if marker == self._marker:
+            return
+
+        total = self.storage.count_contacts()
+        if self._marker is None:
+            rows = self.storage.recent_contacts(self.window)
+        else:
+            rows = self.storage.contacts_since(self._last_seen)
+            if total != self._total + len(rows):
+                # 削除やデータベースの再作成があった場合は読み直す
+                self._reset()
+                rows = self.storage.recent_contacts(self.window)
+
+        self._append(rows)
+        self._total = total
+        self._marker = marker
+
+    def list_contacts(self) -> tuple[tuple[ContactRecord, ...], int]:
+        """最近のお問い合わせ（新しい順に最大 window 件）と、お問い合わせの総件数を返す"""
+        with self._lock:
+            self._refresh()
+            return self._ordered, self._total
+
+    def get_contact(self, contact_id: int) -> Any:
+        """保持範囲外のお問い合わせはストレージから直接読み込む"""
+        with self._lock:
+            self._refresh()
+            record = self._by_id.get(contact_id)
+        if record is None and contact_id <= self._last_seen:
+            return self.storage.get_contact(contact_id)
+        return record
+
+READ_MODEL_WINDOW = int(os.getenv('READ_MODEL_WINDOW', '1000'))  # 管理画面で保持する最近のお問い合わせ件数
+contact_read_model = ContactReadModel(storage, READ_MODEL_WINDOW)
+
+def contact_page(before: Optional[int]) -> tuple[Sequence[Any], int, Optional[int]]:
+    """管理画面の一覧1ページ分を (お問い合わせ, 総件数, 次のページの before) で返す
+
+    最新のページは読み取りモデルから、それより古いページは id をキーにストレージから
+    READ_MODEL_WINDOW 件ずつ読み込む。次のページがなければ before は None。
+    """
+    if before is None:
+        contacts, total = contact_read_model.list_contacts()
+        has_older = total > len(contacts)
+    else:
+        rows = storage.contacts_before(before, READ_MODEL_WINDOW + 1)
+        contacts, total = rows[:READ_MODEL_WINDOW], storage.count_contacts()
+        has_older = len(rows) > READ_MODEL_WINDOW
+    next_before = contacts[-1]['id'] if has_older and contacts else None
+    return contacts, total, next_before
 
 def send_email(to_email: str, subject: str, body: str) -> bool:
     """メール送信関数"""
@@ -335,6 +494,14 @@ def machine() -> str:
 def shop() -> str:
     return render_template('shop.html')
 
+def render_access_form() -> str:
+    """お問い合わせフォームを選択肢付きで描画"""
+    return render_template(
+        'access.html',
+        genres=genre_lookup.options(),
+        user_types=user_type_lookup.options()
+    )
+
 @app.route('/access', methods=['GET', 'POST'])
 def access() -> Union[str, WerkzeugResponse]:
     if request.method == 'POST':
@@ -347,26 +514,26 @@ def access() -> Union[str, WerkzeugResponse]:
             message = request.form['message']
             if not name or not email or not message:
                 flash('必須項目を入力してください。', 'error')
-                return render_template('access.html')
+                return render_access_form()
+
+            genre_id = genre_lookup.id_for(genre)
+            user_type_id = user_type_lookup.id_for(user_type)
+            if genre_id is None or user_type_id is None:
+                flash('お問い合わせ種別またはお客様についての選択が正しくありません。', 'error')
+                return render_access_form()
             
             # タイムゾーンを日本標準時（JST）に設定して時刻を取得
             tokyo_tz = pytz.timezone('Asia/Tokyo')
             created_at_jst = datetime.datetime.now(tokyo_tz)
 
-            conn = get_db_connection()
-            conn.execute(
-                'INSERT INTO contacts (name, email, phone, genre, user_type, message, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
-                (name, email, phone, genre, user_type, message, created_at_jst)
-            )
-            conn.commit()
-            conn.close()
+            storage.add_contact(name, email, phone, genre_id, user_type_id, message, created_at_jst)
             flash('お問い合わせを受け付けました。ありがとうございます。', 'success')
             return redirect(url_for('access'))
         except Exception as e:
             logger.error(f"お問い合わせ処理エラー: {e}")
             flash('エラーが発生しました。再度お試しください。', 'error')
-            return render_template('access.html')
-    return render_template('access.html')
+            return render_access_form()
+    return render_access_form()
 
 # 管理者向けルート
 @app.route('/admin/login', methods=['GET', 'POST'])
@@ -378,8 +545,7 @@ def admin_login() -> Union[str, WerkzeugResponse]:
     if form.validate_on_submit():
         username = form.username.data
         password = form.password.data
-        conn = get_db()
-        user = conn.execute('SELECT * FROM admin_users WHERE username = ?', (username,)).fetchone()
+        user = storage.get_admin_user(username)
         if user and check_password_hash(user['password_hash'], password):
             session['logged_in'] = True
             session['username'] = user['username']
@@ -405,11 +571,7 @@ def forgot_password() -> Union[str, WerkzeugResponse]:
         email = form.email.data
         security_answer = form.security_answer.data
         
-        conn = get_db()
-        user = conn.execute(
-            'SELECT * FROM admin_users WHERE username = ? AND email = ?',
-            (username, email)
-        ).fetchone()
+        user = storage.find_admin_user(username, email)
         
         if user and check_password_hash(user['security_answer_hash'], security_answer):
             # トークンを生成
@@ -419,12 +581,7 @@ def forgot_password() -> Union[str, WerkzeugResponse]:
             expires_at = current_time + datetime.timedelta(hours=24)  # 24時間有効
             
             # トークンをデータベースに保存
-            conn.execute(
-                '''INSERT INTO password_reset_tokens 
-                   (user_id, token, expires_at, created_at) VALUES (?, ?, ?, ?)''',
-                (user['id'], token, expires_at, current_time)
-            )
-            conn.commit()
+            storage.create_reset_token(user['id'], token, expires_at, current_time)
             
             # リセットメールを送信
             reset_url = url_for('reset_password', token=token, _external=True)
@@ -477,17 +634,11 @@ def forgot_password() -> Union[str, WerkzeugResponse]:
 
 @app.route('/admin/reset-password/<token>', methods=['GET', 'POST'])
 def reset_password(token: str) -> Union[str, WerkzeugResponse]:
-    conn = get_db()
     tokyo_tz = pytz.timezone('Asia/Tokyo')
     current_time = datetime.datetime.now(tokyo_tz)
     
     # トークンの有効性を確認
-    token_record = conn.execute(
-        '''SELECT prt.*, au.username FROM password_reset_tokens prt
-           JOIN admin_users au ON prt.user_id = au.id
-           WHERE prt.token = ? AND prt.expires_at > ? AND prt.used = FALSE''',
-        (token, current_time)
-    ).fetchone()
+    token_record = storage.get_valid_reset_token(token, current_time)
     
     if not token_record:
         flash('無効または期限切れのリセットリンクです。', 'error')
@@ -499,19 +650,8 @@ def reset_password(token: str) -> Union[str, WerkzeugResponse]:
         new_password = form.new_password.data
         new_password_hash = generate_password_hash(new_password)
         
-        # パスワードを更新
-        conn.execute(
-            'UPDATE admin_users SET password_hash = ? WHERE id = ?',
-            (new_password_hash, token_record['user_id'])
-        )
-        
-        # トークンを使用済みにマーク
-        conn.execute(
-            'UPDATE password_reset_tokens SET used = TRUE WHERE id = ?',
-            (token_record['id'],)
-        )
-        
-        conn.commit()
+        # パスワードを更新し、トークンを使用済みにマーク
+        storage.reset_password_with_token(token_record['id'], token_record['user_id'], new_password_hash)
         
         flash('パスワードが正常にリセットされました。新しいパスワードでログインしてください。', 'success')
         return redirect(url_for('admin_login'))
@@ -523,16 +663,14 @@ def reset_password(token: str) -> Union[str, WerkzeugResponse]:
 def admin_change_password() -> Union[str, WerkzeugResponse]:
     form = ChangePasswordForm()
     if form.validate_on_submit():
-        conn = get_db()
-        user = conn.execute('SELECT * FROM admin_users WHERE username = ?', (session['username'],)).fetchone()
+        user = storage.get_admin_user(session['username'])
         
         if not check_password_hash(user['password_hash'], form.current_password.data):
             flash('現在のパスワードが間違っています。', 'error')
             return redirect(url_for('admin_change_password'))
 
         new_password_hash = generate_password_hash(form.new_password.data)
-        conn.execute('UPDATE admin_users SET password_hash = ? WHERE id = ?', (new_password_hash, user['id']))
-        conn.commit()
+        storage.update_admin_password(user['id'], new_password_hash)
 
         flash('パスワードが正常に変更されました。', 'success')
         return redirect(url_for('admin_dashboard'))
@@ -547,15 +685,20 @@ def admin_dashboard() -> str:
 @app.route('/admin/contacts')
 @login_required
 def admin_contacts() -> str:
-    conn = get_db()
-    contacts = conn.execute('SELECT * FROM contacts ORDER BY created_at DESC').fetchall()
-    return render_template('admin/contacts.html', contacts=contacts)
+    before = request.args.get('before', type=int)
+    contacts, total, next_before = contact_page(before)
+    return render_template(
+        'admin/contacts.html',
+        contacts=contacts,
+        total=total,
+        before=before,
+        next_before=next_before
+    )
 
 @app.route('/admin/contact/<int:contact_id>')
 @login_required
 def admin_contact_detail(contact_id: int) -> Union[str, WerkzeugResponse]:
-    conn = get_db()
-    contact = conn.execute('SELECT * FROM contacts WHERE id = ?', (contact_id,)).fetchone()
+    contact = contact_read_model.get_contact(contact_id)
     if contact is None:
         flash('お問い合わせが見つかりません。', 'error')
         return redirect(url_for('admin_contacts'))
@@ -564,31 +707,35 @@ def admin_contact_detail(contact_id: int) -> Union[str, WerkzeugResponse]:
 @app.route('/admin/api/contacts')
 @login_required
 def api_contacts() -> FlaskResponse:
-    conn = get_db()
-    contacts = conn.execute('SELECT * FROM contacts ORDER BY created_at DESC').fetchall()
-    return jsonify([dict(contact) for contact in contacts])
+    # 本文は従来どおり配列のまま、総件数と次のページは X-Total-Count・Link ヘッダーで返す
+    before = request.args.get('before', type=int)
+    contacts, total, next_before = contact_page(before)
+    response = jsonify([
+        contact.to_dict() if isinstance(contact, ContactRecord) else dict(contact)
+        for contact in contacts
+    ])
+    response.headers['X-Total-Count'] = str(total)
+    if next_before is not None:
+        response.headers['Link'] = f'<{url_for("api_contacts", before=next_before)}>; rel="next"'
+    return response
 
 @app.route('/admin/api/stats')
 @login_required
 def api_stats() -> FlaskResponse:
-    conn = get_db()
     tokyo_tz = pytz.timezone('Asia/Tokyo')
     now_jst = datetime.datetime.now(tokyo_tz)
     current_month_str = now_jst.strftime('%Y-%m')
 
-    total_contacts = conn.execute('SELECT COUNT(*) FROM contacts').fetchone()[0]
-    this_month = conn.execute(
-        "SELECT COUNT(*) FROM contacts WHERE strftime('%Y-%m', created_at) = ?",
-        (current_month_str,)
-    ).fetchone()[0]
-    genre_stats = conn.execute('SELECT genre, COUNT(*) FROM contacts GROUP BY genre').fetchall()
-    user_type_stats = conn.execute('SELECT user_type, COUNT(*) FROM contacts GROUP BY user_type').fetchall()
+    total_contacts = storage.count_contacts()
+    this_month = storage.count_contacts_in_month(current_month_str)
+    genre_stats = storage.count_contacts_by('genre_id')
+    user_type_stats = storage.count_contacts_by('user_type_id')
     
     return jsonify({
         'total_contacts': total_contacts,
         'this_month': this_month,
-        'genre_stats': [{'genre': g[0], 'count': g[1]} for g in genre_stats],
-        'user_type_stats': [{'user_type': u[0], 'count': u[1]} for u in user_type_stats]
+        'genre_stats': [{'genre': genre_lookup.label(g[0]), 'count': g[1]} for g in genre_stats],
+        'user_type_stats': [{'user_type': user_type_lookup.label(u[0]), 'count': u[1]} for u in user_type_stats]
     })
 
 # セキュリティ関連のユーティリティルート
@@ -634,18 +781,82 @@ def test_email() -> Union[str, FlaskResponse]:
 @login_required
 def cleanup_expired_tokens() -> FlaskResponse:
     """期限切れのトークンをクリーンアップ"""
-    conn = get_db()
     tokyo_tz = pytz.timezone('Asia/Tokyo')
     current_time = datetime.datetime.now(tokyo_tz)
     
-    deleted = conn.execute(
-        'DELETE FROM password_reset_tokens WHERE expires_at < ?',
-        (current_time,)
-    ).rowcount
-    conn.commit()
+    deleted = storage.delete_expired_tokens(current_time)
     
     return jsonify({'deleted_tokens': deleted})
 
+# ヘルスチェック・ウォームアップ（Azure App Service のヘルスチェック・ウォームアップ用）
+READINESS_CACHE_SECONDS = float(os.getenv('READINESS_CACHE_SECONDS', '5'))
+WARMUP_PATHS = ('/', '/about', '/concept', '/product', '/machine', '/shop', '/access')
+
+_readiness_lock = threading.Lock()
+_readiness: dict[str, Any] = {'checked_at': None, 'ready': False}
+_warmup_lock = threading.Lock()
+_warmed_pid: Optional[int] = None
+
+def warm_up() -> None:
+    """接続・テンプレート・読み取りモデルを事前に読み込み、最初の訪問者を待たせない"""
+    global _warmed_pid
+    with _warmup_lock:
+        if _warmed_pid == os.getpid():
+            return
+        started = time.monotonic()
+        # 接続（PostgreSQLではコネクションプール）と読み取りモデル
+        storage.is_initialized()
+        genre_lookup.options()
+        user_type_lookup.options()
+        contact_read_model.list_contacts()
+        # テンプレートのコンパイル
+        for name in app.jinja_env.list_templates(extensions=['html']):
+            app.jinja_env.get_template(name)
+        # 公開ページを一度描画してURLマップ等も温めておく
+        # エラーになったページがあればウォームアップ失敗とし、/readyz は503を返す
+        client = app.test_client()
+        for path in WARMUP_PATHS:
+            response = client.get(path)
+            if response.status_code >= 400:
+                raise RuntimeError(f"ウォームアップ対象のページがエラーを返しました: {path} ({response.status_code})")
+        _warmed_pid = os.getpid()
+        logger.info(f"ウォームアップ完了: {time.monotonic() - started:.2f}秒 (pid={_warmed_pid})")
+
+def is_ready() -> bool:
+    """データベースの準備状況を確認（結果は READINESS_CACHE_SECONDS 秒キャッシュ）"""
+    with _readiness_lock:
+        now = time.monotonic()
+        checked_at = _readiness['checked_at']
+        if checked_at is not None and now - checked_at < READINESS_CACHE_SECONDS:
+            return _readiness['ready']
+        try:
+            # 旧形式の列が残ったままでは問い合わせを保存できないため、移行完了までは準備中とする
+            ready = storage.is_initialized() and storage.lookups_migrated()
+        except Exception as e:
+            logger.warning(f"レディネスチェック失敗: {e}")
+            ready = False
+        _readiness['checked_at'] = now
+        _readiness['ready'] = ready
+        return ready
+
+@app.route('/healthz')
+def healthz() -> tuple[str, int, dict[str, str]]:
+    """ライブネスチェック（I/Oを行わない）"""
+    return 'ok', 200, {'Content-Type': 'text/plain; charset=utf-8', 'Cache-Control': 'no-store'}
+
+@app.route('/readyz')
+def readyz() -> tuple[FlaskResponse, int]:
+    """レディネスチェック（未ウォームアップのワーカーではここでウォームアップする）"""
+    if not is_ready():
+        return jsonify({'status': 'not_ready'}), 503
+    if _warmed_pid != os.getpid():
+        try:
+            warm_up()
+        except Exception as e:
+            logger.error(f"ウォームアップエラー: {e}")
+            return jsonify({'status': 'warming_up'}), 503
+    return jsonify({'status': 'ready'}), 200
+
 @app.errorhandler(404)
 def not_found_error(error: Exception) -> tuple[str, int]:
     return render_template('errors/404.html'), 404
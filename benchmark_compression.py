@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+レスポンス圧縮のベンチマーク
+ルートごとに、圧縮で削減できたバイト数と1リクエストあたりのCPU時間の増分を表示する
+
+使い方:
+    python benchmark_compression.py [--contacts 500] [--iterations 50]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+BENCH_PATHS = (
+    '/',
+    '/about',
+    '/product',
+    '/access',
+    '/static/css/common.css',
+    '/static/images/index/bg-main.jpg',
+    '/admin/contacts',
+    '/admin/api/contacts',
+)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='レスポンス圧縮のベンチマーク')
+    parser.add_argument('--contacts', type=int, default=500, help='投入するお問い合わせ件数')
+    parser.add_argument('--iterations', type=int, default=50, help='ルートごとの計測回数')
+    args = parser.parse_args()
+
+    # 一時ディレクトリのSQLiteデータベースを使う（本番・開発用のDBには触れない）
+    # load_dotenv() は設定済みの環境変数を上書きしないため、.env の DATABASE_URL や
+    # 本番用のDBパス（/home/perch_database.db）が使われないよう先に空にしておく
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ['DATABASE_URL'] = ''
+    os.environ['FLASK_ENV'] = 'development'
+    os.environ['WEBSITE_SITE_NAME'] = ''
+    workdir = tempfile.mkdtemp(prefix='perch-bench-')
+    os.chdir(workdir)
+
+    import app as perch
+    import compression
+    from storage import SQLiteStorage
+
+    database = getattr(perch.storage, 'database', None)
+    if not isinstance(perch.storage, SQLiteStorage) or os.path.dirname(os.path.realpath(database)) != os.path.realpath(workdir):
+        sys.exit(f"一時ディレクトリ以外のデータベースが選択されたため中止します: {perch.storage!r}")
+
+    now = datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=9)))
+    genre_id = perch.genre_lookup.id_for(perch.DEFAULT_GENRES[0][0])
+    user_type_id = perch.user_type_lookup.id_for(perch.DEFAULT_USER_TYPES[0][0])
+    for i in range(args.contacts):
+        perch.storage.add_contact(
+            f'お客様{i}', f'user{i}@example.com', '090-0000-0000',
+            genre_id, user_type_id, 'お問い合わせ内容のサンプルです。' * 5, now
+        )
+
+    client = perch.app.test_client()
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+        sess['username'] = perch.DEFAULT_ADMIN_USERNAME
+
+    encodings = ['gzip'] + (['br'] if compression.brotli is not None else [])
+    print(f"min_size={perch.COMPRESS_MIN_SIZE} level={perch.COMPRESS_LEVEL} "
+          f"brotli_quality={perch.COMPRESS_BROTLI_QUALITY} iterations={args.iterations}")
+    print(f"{'route':<36}{'enc':<6}{'raw':>10}{'sent':>10}{'saved':>8}{'+cpu ms/req':>13}")
+
+    for path in BENCH_PATHS:
+        baseline = _measure(client, path, 'identity', args.iterations)
+        for encoding in encodings:
+            result = _measure(client, path, encoding, args.iterations)
+            saved = 1 - result['size'] / baseline['size'] if baseline['size'] else 0.0
+            extra_cpu = (result['cpu'] - baseline['cpu']) * 1000
+            print(f"{path:<36}{result['encoding'] or '-':<6}{baseline['size']:>10}{result['size']:>10}"
+                  f"{saved:>8.1%}{extra_cpu:>13.3f}")
+
+def _measure(client, path: str, encoding: str, iterations: int) -> dict:
+    """指定したAccept-Encodingで計測し、送信バイト数と1リクエストあたりのCPU時間を返す"""
+    headers = {'Accept-Encoding': encoding}
+    response = client.get(path, headers=headers)
+    size = len(response.get_data())
+    content_encoding = response.headers.get('Content-Encoding')
+    started = time.process_time()
+    for _ in range(iterations):
+        client.get(path, headers=headers).get_data()
+    cpu = (time.process_time() - started) / iterations
+    return {'size': size, 'cpu': cpu, 'encoding': content_encoding}
+
+if __name__ == '__main__':
+    main()
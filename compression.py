@@ -0,0 +1,240 @@
+"""
+レスポンス圧縮用のWSGIミドルウェア
+Accept-Encoding に応じて gzip（brotli がインストールされていれば br）で圧縮する
+"""
+
+import zlib
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli は任意の依存
+    brotli = None
+
+# 圧縮対象のContent-Type（JPEG・PNGなど圧縮済みの形式は含めない）
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/xml',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'image/svg+xml',
+})
+
+# 本文を持たない、または部分的な本文を返すステータス
+SKIP_STATUSES = ('204', '206', '304')
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Accept-Encoding ヘッダーを {エンコーディング: q値} に変換"""
+    encodings: dict[str, float] = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name] = q
+    return encodings
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        # wbits=31 で gzip ヘッダー付きの出力になる
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._obj.compress(data)
+        if flush:
+            out += self._obj.flush(zlib.Z_SYNC_FLUSH)
+        return out
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._obj.process(data)
+        if flush:
+            out += self._obj.flush()
+        return out
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+class CompressionMiddleware:
+    """HTML・JSONなどのテキストレスポンスを圧縮するWSGIミドルウェア
+
+    - min_size バイト未満のレスポンスはそのまま返す
+    - Content-Length のないストリーミングレスポンスはチャンクごとにフラッシュして送出する
+    - 既に Content-Encoding が付いたレスポンスや画像などは圧縮しない
+    """
+
+    def __init__(self, app: Callable, min_size: int = 500, level: int = 6,
+                 brotli_quality: int = 4, mimetypes: Iterable[str] = COMPRESSIBLE_MIMETYPES) -> None:
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = frozenset(mimetypes)
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """クライアントが受け入れる最適なエンコーディングを返す（なければNone）"""
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get('*', 0.0)
+        candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+        best, best_q = None, 0.0
+        for name in candidates:
+            q = accepted.get(name, wildcard)
+            if q > best_q:
+                best, best_q = name, q
+        return best
+
+    def _compressor(self, encoding: str) -> Any:
+        if encoding == 'br':
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.level)
+
+    def _is_compressible_type(self, headers: list[tuple[str, str]]) -> bool:
+        for name, value in headers:
+            if name.lower() == 'content-type':
+                return value.split(';', 1)[0].strip().lower() in self.mimetypes
+        return False
+
+    def _should_compress(self, status: str, headers: list[tuple[str, str]]) -> bool:
+        if status[:3] in SKIP_STATUSES:
+            return False
+        for name, value in headers:
+            lname = name.lower()
+            if lname == 'content-encoding' or lname == 'content-range':
+                return False
+            if lname == 'cache-control' and 'no-transform' in value.lower():
+                return False
+        return self._is_compressible_type(headers)
+
+    def _vary_headers(self, headers: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """圧縮対象のContent-Typeなら、実際に圧縮したかに関わらず Vary: Accept-Encoding を付ける
+
+        共有キャッシュが非圧縮の応答を全クライアントに返さないようにするため。
+        """
+        if not self._is_compressible_type(headers):
+            return headers
+        vary = [value for name, value in headers if name.lower() == 'vary']
+        if any('accept-encoding' in v.lower() for v in vary):
+            return headers
+        new_headers = [(name, value) for name, value in headers if name.lower() != 'vary']
+        new_headers.append(('Vary', ', '.join(vary + ['Accept-Encoding'])))
+        return new_headers
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        encoding = self.negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            def _vary_start_response(status: str, headers: list[tuple[str, str]], exc_info: Any = None) -> Callable:
+                return start_response(status, self._vary_headers(headers), exc_info)
+            return self.app(environ, _vary_start_response)
+
+        state: dict[str, Any] = {}
+
+        def _start_response(status: str, headers: list[tuple[str, str]], exc_info: Any = None) -> Callable:
+            if exc_info is not None or not self._should_compress(status, headers):
+                state['passthrough'] = True
+                return start_response(status, self._vary_headers(headers), exc_info)
+            state['status'] = status
+            state['headers'] = headers
+            state['passthrough'] = False
+
+            def write(data: bytes) -> None:
+                raise RuntimeError("CompressionMiddleware は write() 呼び出しに対応していません")
+            return write
+
+        app_iter = self.app(environ, _start_response)
+        if state.get('passthrough'):
+            return app_iter
+        return self._compress(app_iter, encoding, state, start_response)
+
+    def _compress(self, app_iter: Iterable[bytes], encoding: str, state: dict,
+                  start_response: Callable) -> Iterator[bytes]:
+        iterator = iter(app_iter)
+        buffered: list[bytes] = []
+        size = 0
+        exhausted = False
+        try:
+            if not state:
+                # start_response を本文の反復中に呼ぶアプリケーションのため、先頭チャンクを読む
+                chunk = next(iterator, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    buffered.append(chunk)
+                    size += len(chunk)
+            if state.get('passthrough'):
+                yield from buffered
+                yield from iterator
+                return
+
+            status, headers = state['status'], state['headers']
+            content_length = None
+            for name, value in headers:
+                if name.lower() == 'content-length':
+                    content_length = int(value)
+
+            if content_length is not None and content_length < self.min_size:
+                start_response(status, self._vary_headers(headers))
+                yield from buffered
+                yield from iterator
+                return
+
+            # しきい値に達するまで本文を溜め、小さいレスポンスは圧縮しない
+            while not exhausted and size < self.min_size:
+                chunk = next(iterator, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                buffered.append(chunk)
+                size += len(chunk)
+
+            if exhausted and size < self.min_size:
+                start_response(status, self._vary_headers(headers))
+                yield from buffered
+                return
+
+            compressor = self._compressor(encoding)
+            new_headers = [
+                (name, value) for name, value in self._vary_headers(headers)
+                if name.lower() not in ('content-length', 'etag')
+            ]
+            for name, value in headers:
+                # 圧縮後は別の表現になるため、強いETagは弱いETagにする
+                if name.lower() == 'etag':
+                    new_headers.append((name, value if value.startswith('W/') else f'W/{value}'))
+            new_headers.append(('Content-Encoding', encoding))
+
+            if exhausted or content_length is not None:
+                # 本文の長さが分かっている場合は一括で圧縮して Content-Length を付ける
+                body = b''.join(buffered) + b''.join(iterator)
+                data = compressor.compress(body, flush=False) + compressor.finish()
+                new_headers.append(('Content-Length', str(len(data))))
+                start_response(status, new_headers)
+                yield data
+                return
+
+            # ストリーミングレスポンス：チャンクごとにフラッシュして逐次送出する
+            start_response(status, new_headers)
+            yield compressor.compress(b''.join(buffered), flush=True)
+            for chunk in iterator:
+                if chunk:
+                    yield compressor.compress(chunk, flush=True)
+            yield compressor.finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
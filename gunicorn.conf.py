@@ -0,0 +1,11 @@
+"""
+Gunicorn設定ファイル（起動ディレクトリにあれば自動で読み込まれる）
+"""
+
+def post_worker_init(worker):
+    """ワーカーがリクエストを受け付ける前にウォームアップする"""
+    from app import warm_up
+    try:
+        warm_up()
+    except Exception as e:
+        worker.log.error(f"ウォームアップエラー: {e}")
@@ -41,7 +41,7 @@ else:
 
 # アプリケーションをインポート
 try:
-    from app import app, init_db
+    from app import app, init_db, warm_up
     logger.info("アプリケーションのインポート完了")
 except ImportError as e:
     logger.error(f"アプリケーションのインポートに失敗: {e}")
@@ -69,6 +69,12 @@ else:
 
 # web.configから直接呼び出される場合の処理
 if __name__ == '__main__':
+    # 最初のリクエストの前に接続・テンプレートを温めておく
+    try:
+        warm_up()
+    except Exception as e:
+        logger.warning(f"ウォームアップに失敗しましたが、アプリケーションを起動します: {e}")
+
     if IS_AZURE and HTTP_PLATFORM_PORT:
         # Azure App ServiceのhttpPlatformHandlerから呼び出された場合
         port = int(HTTP_PLATFORM_PORT)
@@ -0,0 +1,619 @@
+"""
+データベースアクセス層
+お問い合わせ・管理者ユーザー・パスワードリセットトークンの読み書きをまとめ、
+SQLiteとPostgreSQL（コネクションプール付き）を同じインターフェースで扱う
+"""
+
+import abc
+import contextlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Hashable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# お問い合わせの低カーディナリティ項目を保持するルックアップテーブル
+LOOKUP_TABLES = ('genres', 'user_types')
+
+# ルックアップテーブルへ移行する旧テキスト列: (旧列, 新しいid列, テーブル)
+LOOKUP_COLUMNS = (
+    ('genre', 'genre_id', 'genres'),
+    ('user_type', 'user_type_id', 'user_types'),
+)
+
+# 移行で取り込んだ旧データのラベルの表示順（初期値より後ろに並べる）
+LEGACY_SORT_ORDER = 1000
+
+# 旧データで genre・user_type が NULL だった行に割り当てるラベル
+MISSING_LABEL = '未設定'
+
+class Storage(abc.ABC):
+    """ストレージの共通インターフェース
+
+    SQLは ? プレースホルダで記述し、各バックエンドが自身の形式に変換する。
+    バックエンドごとに異なる部分（接続、スキーマ、変更検知、月別集計）だけをサブクラスで実装する。
+    未実装の抽象メソッドがあるサブクラスはインスタンス化の時点で TypeError になる。
+    """
+
+    placeholder = '?'
+
+    # --- 接続管理 ---
+    @abc.abstractmethod
+    def connection(self) -> contextlib.AbstractContextManager[Any]:
+        """正常終了でコミット、例外でロールバックする接続のコンテキストマネージャ"""
+
+    def _cursor(self, conn: Any) -> Any:
+        return conn.cursor()
+
+    def _sql(self, sql: str) -> str:
+        if self.placeholder == '?':
+            return sql
+        return sql.replace('?', self.placeholder)
+
+    def _fetchone(self, sql: str, params: tuple = ()) -> Any:
+        with self.connection() as conn:
+            cur = self._cursor(conn)
+            cur.execute(self._sql(sql), params)
+            return cur.fetchone()
+
+    def _fetchall(self, sql: str, params: tuple = ()) -> list:
+        with self.connection() as conn:
+            cur = self._cursor(conn)
+            cur.execute(self._sql(sql), params)
+            return cur.fetchall()
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        with self.connection() as conn:
+            cur = self._cursor(conn)
+            cur.execute(self._sql(sql), params)
+            return cur.rowcount
+
+    def _scalar(self, sql: str, params: tuple = ()) -> Any:
+        row = self._fetchone(sql, params)
+        return None if row is None else list(row.values() if isinstance(row, dict) else row)[0]
+
+    def release(self) -> None:
+        """現在のスレッドが保持している接続を手放す（リクエスト終了時に呼ぶ）"""
+        pass
+
+    def close(self) -> None:
+        pass
+
+    # --- スキーマ ---
+    @abc.abstractmethod
+    def init_schema(self) -> None:
+        """テーブルを作成する（作成済みなら何もしない）"""
+
+    @abc.abstractmethod
+    def is_initialized(self) -> bool:
+        """必要なテーブルがすべて存在すれば True"""
+
+    @abc.abstractmethod
+    def _contact_columns(self) -> set[str]:
+        """contacts テーブルの列名"""
+
+    def migrate_contact_lookups(self, batch_size: int = 500) -> None:
+        """contacts の genre・user_type テキスト列をルックアップテーブルのid列へ移行する
+
+        バッチごとにコミットするため、途中で中断しても再実行すれば続きから移行できる。
+        旧列が NULL の行は MISSING_LABEL（無効なラベル）に割り当てる。
+        旧列はすべての行にidが入ったことを確認してから削除し、id列を NOT NULL にする
+        （SQLiteは既存列に NOT NULL を付けられないため、移行したDBでは NULL 許可のまま）。
+        idが入っていない行が残った場合は旧列を残したまま RuntimeError を送出する。
+        """
+        columns = self._contact_columns()
+        pending = [spec for spec in LOOKUP_COLUMNS if spec[0] in columns]
+        if not pending:
+            return
+
+        logger.info(f"お問い合わせ項目のルックアップテーブル移行を開始: {[spec[0] for spec in pending]}")
+        for old_column, id_column, table in pending:
+            if id_column not in columns:
+                self._execute(f'ALTER TABLE contacts ADD COLUMN {id_column} INTEGER REFERENCES {table} (id)')
+            # 旧データのラベルは既存行の表示用に残すが、フォームの選択肢には出さない（active = FALSE）
+            self._execute(
+                f'''INSERT INTO {table} (label, sort_order, active)
+                    SELECT DISTINCT {old_column}, ?, FALSE FROM contacts WHERE {old_column} IS NOT NULL
+                    ON CONFLICT (label) DO NOTHING''',
+                (LEGACY_SORT_ORDER,)
+            )
+
+        assignments = ', '.join(
+            f'{id_column} = (SELECT id FROM {table} WHERE label = contacts.{old_column})'
+            for old_column, id_column, table in pending
+        )
+        last_id = 0
+        migrated = 0
+        while True:
+            upper = self._scalar(
+                'SELECT MAX(id) FROM (SELECT id FROM contacts WHERE id > ? ORDER BY id LIMIT ?) AS batch',
+                (last_id, batch_size)
+            )
+            if upper is None:
+                break
+            migrated += self._execute(
+                f'UPDATE contacts SET {assignments} WHERE id > ? AND id <= ?',
+                (last_id, upper)
+            )
+            last_id = upper
+
+        for _, id_column, table in pending:
+            if self._scalar(f'SELECT COUNT(*) FROM contacts WHERE {id_column} IS NULL'):
+                self._execute(
+                    f'''INSERT INTO {table} (label, sort_order, active) VALUES (?, ?, FALSE)
+                        ON CONFLICT (label) DO NOTHING''',
+                    (MISSING_LABEL, LEGACY_SORT_ORDER)
+                )
+                self._execute(
+                    f'''UPDATE contacts SET {id_column} = (SELECT id FROM {table} WHERE label = ?)
+                        WHERE {id_column} IS NULL''',
+                    (MISSING_LABEL,)
+                )
+
+        # 元に戻せない列の削除の前に、idが入っていない行がないことを確認する
+        missing = self._scalar(
+            'SELECT COUNT(*) FROM contacts WHERE '
+            + ' OR '.join(f'{id_column} IS NULL' for _, id_column, _ in pending)
+        )
+        if missing:
+            raise RuntimeError(f"idが設定されていないお問い合わせが{missing}件あるため、旧列を削除せずに移行を中断しました")
+
+        for old_column, id_column, _ in pending:
+            self._set_not_null('contacts', id_column)
+            self._execute(f'ALTER TABLE contacts DROP COLUMN {old_column}')
+        logger.info(f"ルックアップテーブル移行完了: {migrated}件")
+
+    def lookups_migrated(self) -> bool:
+        """旧形式のテキスト列が残っていなければ True（残っているとお問い合わせを保存できない）"""
+        columns = self._contact_columns()
+        return not any(old_column in columns for old_column, _, _ in LOOKUP_COLUMNS)
+
+    def _set_not_null(self, table: str, column: str) -> None:
+        self._execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+
+    # --- ルックアップテーブル ---
+    def list_lookup(self, table: str) -> list[tuple[int, str, str, bool]]:
+        """ルックアップテーブルの (id, ラベル, 表示名, 有効) を表示順に返す"""
+        if table not in LOOKUP_TABLES:
+            raise ValueError(f"ルックアップテーブルではありません: {table}")
+        rows = self._fetchall(
+            f'''SELECT id, label, COALESCE(display_label, label) AS display_label, active
+                FROM {table} ORDER BY sort_order, id'''
+        )
+        return [(row['id'], row['label'], row['display_label'], bool(row['active'])) for row in rows]
+
+    def add_lookup_labels(self, table: str, labels: Iterable[tuple[str, str]]) -> None:
+        """(ラベル, 表示名) を与えた順の表示順で有効なラベルとして追加する（既存のラベルは変更しない）"""
+        if table not in LOOKUP_TABLES:
+            raise ValueError(f"ルックアップテーブルではありません: {table}")
+        with self.connection() as conn:
+            cur = self._cursor(conn)
+            for sort_order, (label, display_label) in enumerate(labels):
+                cur.execute(
+                    self._sql(
+                        f'''INSERT INTO {table} (label, display_label, sort_order, active)
+                            VALUES (?, ?, ?, TRUE) ON CONFLICT (label) DO NOTHING'''
+                    ),
+                    (label, display_label, sort_order)
+                )
+
+    # --- お問い合わせ ---
+    def add_contact(self, name: str, email: str, phone: str, genre_id: int,
+                    user_type_id: int, message: str, created_at: Any) -> None:
+        self._execute(
+            'INSERT INTO contacts (name, email, phone, genre_id, user_type_id, message, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (name, email, phone, genre_id, user_type_id, message, created_at)
+        )
+
+    def list_contacts(self) -> list:
+        """ラベルを結合したお問い合わせを受付日時の新しい順に返す"""
+        return self._fetchall(
+            '''SELECT c.*, g.label AS genre, u.label AS user_type FROM contacts c
+               LEFT JOIN genres g ON c.genre_id = g.id
+               LEFT JOIN user_types u ON c.user_type_id = u.id
+               ORDER BY c.created_at DESC'''
+        )
+
+    def get_contact(self, contact_id: int) -> Any:
+        return self._fetchone(
+            '''SELECT c.*, g.label AS genre, u.label AS user_type FROM contacts c
+               LEFT JOIN genres g ON c.genre_id = g.id
+               LEFT JOIN user_types u ON c.user_type_id = u.id
+               WHERE c.id = ?''',
+            (contact_id,)
+        )
+
+    def contacts_before(self, before_id: int, limit: int) -> list:
+        """id が before_id より小さいお問い合わせを、ラベルを結合して id の降順に最大 limit 件返す"""
+        return self._fetchall(
+            '''SELECT c.*, g.label AS genre, u.label AS user_type FROM contacts c
+               LEFT JOIN genres g ON c.genre_id = g.id
+               LEFT JOIN user_types u ON c.user_type_id = u.id
+               WHERE c.id < ? ORDER BY c.id DESC LIMIT ?''',
+            (before_id, limit)
+        )
+
+    def contacts_since(self, last_id: int) -> list:
+        """id が last_id より大きいお問い合わせを id 順に返す（ラベルは結合しない）"""
+        return self._fetchall('SELECT * FROM contacts WHERE id > ? ORDER BY id', (last_id,))
+
+    def recent_contacts(self, limit: int) -> list:
+        """最新 limit 件のお問い合わせを id 順に返す（ラベルは結合しない）"""
+        rows = self._fetchall('SELECT * FROM contacts ORDER BY id DESC LIMIT ?', (limit,))
+        return list(reversed(rows))
+
+    def count_contacts(self) -> int:
+        return self._scalar('SELECT COUNT(*) FROM contacts')
+
+    @abc.abstractmethod
+    def count_contacts_in_month(self, month: str) -> int:
+        """YYYY-MM 形式の月に受け付けたお問い合わせ数"""
+
+    def count_contacts_by(self, column: str) -> list[tuple[Any, int]]:
+        """id列（genre_id・user_type_id）ごとの件数"""
+        if column not in ('genre_id', 'user_type_id'):
+            raise ValueError(f"集計できない列です: {column}")
+        rows = self._fetchall(f'SELECT {column}, COUNT(*) AS count FROM contacts GROUP BY {column}')
+        return [(row[column], row['count']) for row in rows]
+
+    @abc.abstractmethod
+    def change_marker(self) -> Hashable:
+        """お問い合わせに変更があった時に値が変わるマーカー（読み取りモデルの無効化用）"""
+
+    # --- 管理者ユーザー ---
+    def count_admin_users(self) -> int:
+        return self._scalar('SELECT COUNT(*) FROM admin_users')
+
+    def create_admin_user(self, username: str, password_hash: str, email: str,
+                          security_question: str, security_answer_hash: str, created_at: Any) -> None:
+        self._execute(
+            '''INSERT INTO admin_users
+               (username, password_hash, email, security_question, security_answer_hash, created_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            (username, password_hash, email, security_question, security_answer_hash, created_at)
+        )
+
+    def get_admin_user(self, username: str) -> Any:
+        return self._fetchone('SELECT * FROM admin_users WHERE username = ?', (username,))
+
+    def find_admin_user(self, username: str, email: str) -> Any:
+        return self._fetchone(
+            'SELECT * FROM admin_users WHERE username = ? AND email = ?',
+            (username, email)
+        )
+
+    def update_admin_password(self, user_id: int, password_hash: str) -> None:
+        self._execute('UPDATE admin_users SET password_hash = ? WHERE id = ?', (password_hash, user_id))
+
+    # --- パスワードリセットトークン ---
+    def create_reset_token(self, user_id: int, token: str, expires_at: Any, created_at: Any) -> None:
+        self._execute(
+            '''INSERT INTO password_reset_tokens
+               (user_id, token, expires_at, created_at) VALUES (?, ?, ?, ?)''',
+            (user_id, token, expires_at, created_at)
+        )
+
+    def get_valid_reset_token(self, token: str, now: Any) -> Any:
+        """有効期限内かつ未使用のトークンを、ユーザー名付きで返す"""
+        return self._fetchone(
+            '''SELECT prt.*, au.username FROM password_reset_tokens prt
+               JOIN admin_users au ON prt.user_id = au.id
+               WHERE prt.token = ? AND prt.expires_at > ? AND prt.used = FALSE''',
+            (token, now)
+        )
+
+    def reset_password_with_token(self, token_id: int, user_id: int, password_hash: str) -> None:
+        """パスワードの更新とトークンの使用済み化を同一トランザクションで行う"""
+        with self.connection() as conn:
+            cur = self._cursor(conn)
+            cur.execute(self._sql('UPDATE admin_users SET password_hash = ? WHERE id = ?'), (password_hash, user_id))
+            cur.execute(self._sql('UPDATE password_reset_tokens SET used = TRUE WHERE id = ?'), (token_id,))
+
+    def delete_expired_tokens(self, now: Any) -> int:
+        return self._execute('DELETE FROM password_reset_tokens WHERE expires_at < ?', (now,))
+
+
+class SQLiteStorage(Storage):
+    """SQLiteファイルを使うストレージ
+
+    接続はスレッドごとに1本を使い回し、release() で閉じる（Flaskではリクエスト終了時）。
+    """
+
+    def __init__(self, database: str) -> None:
+        self.database = database
+        self._local = threading.local()
+        self._watch_lock = threading.Lock()
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._watch_pid: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return f"SQLiteStorage({self.database!r})"
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        local = self._local
+        # fork前に開いた接続は子プロセスで使わない
+        if getattr(local, 'conn', None) is None or local.pid != os.getpid():
+            local.conn = sqlite3.connect(self.database)
+            local.conn.row_factory = sqlite3.Row
+            local.pid = os.getpid()
+            local.depth = 0
+        return local.conn
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._thread_connection()
+        local = self._local
+        local.depth += 1
+        try:
+            yield conn
+            # 入れ子で使われた場合は一番外側でコミットする
+            if local.depth == 1:
+                conn.commit()
+        except Exception:
+            if local.depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            local.depth -= 1
+
+    def release(self) -> None:
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.depth > 0:
+            return
+        if local.pid == os.getpid():
+            conn.close()
+        local.conn = None
+
+    def init_schema(self) -> None:
+        with self.connection() as conn:
+            for table in LOOKUP_TABLES:
+                conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        label TEXT UNIQUE NOT NULL,
+                        display_label TEXT,
+                        sort_order INTEGER NOT NULL DEFAULT 0,
+                        active BOOLEAN NOT NULL DEFAULT TRUE
+                    )
+                ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS contacts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    phone TEXT,
+                    genre_id INTEGER NOT NULL REFERENCES genres (id),
+                    user_type_id INTEGER NOT NULL REFERENCES user_types (id),
+                    message TEXT NOT NULL,
+                    created_at TIMESTAMP
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS admin_users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    security_question TEXT NOT NULL,
+                    security_answer_hash TEXT NOT NULL,
+                    created_at TIMESTAMP
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS password_reset_tokens (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    token TEXT UNIQUE NOT NULL,
+                    expires_at TIMESTAMP NOT NULL,
+                    used BOOLEAN DEFAULT FALSE,
+                    created_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES admin_users (id)
+                )
+            ''')
+
+    def is_initialized(self) -> bool:
+        if not os.path.exists(self.database):
+            logger.info(f"データベースファイルが存在しません: {self.database}")
+            return False
+        rows = self._fetchall(
+            '''SELECT name FROM sqlite_master WHERE type='table'
+               AND name IN ('contacts', 'admin_users', 'password_reset_tokens', 'genres', 'user_types')'''
+        )
+        return len(rows) == 5
+
+    def _contact_columns(self) -> set[str]:
+        return {row['name'] for row in self._fetchall('PRAGMA table_info(contacts)')}
+
+    def _set_not_null(self, table: str, column: str) -> None:
+        # SQLiteはテーブルを作り直さないと既存列に NOT NULL を付けられないため、何もしない
+        pass
+
+    def count_contacts_in_month(self, month: str) -> int:
+        return self._scalar(
+            "SELECT COUNT(*) FROM contacts WHERE strftime('%Y-%m', created_at) = ?",
+            (month,)
+        )
+
+    def change_marker(self) -> Hashable:
+        # PRAGMA data_version は他の接続がコミットした時だけ変化するため、
+        # 監視用の接続をプロセスごとに1本保持する（fork後は開き直す）
+        with self._watch_lock:
+            if self._watch_conn is None or self._watch_pid != os.getpid():
+                self._watch_conn = sqlite3.connect(self.database, check_same_thread=False)
+                self._watch_pid = os.getpid()
+            return self._watch_conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def close(self) -> None:
+        with self._watch_lock:
+            if self._watch_conn is not None and self._watch_pid == os.getpid():
+                self._watch_conn.close()
+            self._watch_conn = None
+
+
+class PostgresStorage(Storage):
+    """PostgreSQLを使うストレージ（ThreadedConnectionPoolで接続を再利用）"""
+
+    placeholder = '%s'
+
+    def __init__(self, dsn: str, min_connections: int = 1, max_connections: int = 10) -> None:
+        try:
+            import psycopg2.extras
+            import psycopg2.pool
+        except ImportError as e:
+            raise RuntimeError("PostgreSQLを使用するには psycopg2-binary をインストールしてください") from e
+        self._extras = psycopg2.extras
+        self._pool_class = psycopg2.pool.ThreadedConnectionPool
+        self.dsn = dsn
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool_lock = threading.Lock()
+        self._pool: Any = None
+        self._pool_pid: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return f"PostgresStorage(max_connections={self.max_connections})"
+
+    def _get_pool(self) -> Any:
+        # gunicorn --preload でfork後にソケットを共有しないよう、プロセスごとにプールを作る
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = self._pool_class(self.min_connections, self.max_connections, self.dsn)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[Any]:
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            # 接続が切れている場合のrollback失敗で元の例外を隠さない
+            try:
+                conn.rollback()
+            except Exception as rollback_error:
+                logger.warning(f"ロールバックに失敗しました: {rollback_error}")
+            raise
+        finally:
+            # 切断された接続はプールに戻さず破棄する
+            pool.putconn(conn, close=conn.closed != 0)
+
+    def _cursor(self, conn: Any) -> Any:
+        return conn.cursor(cursor_factory=self._extras.RealDictCursor)
+
+    def init_schema(self) -> None:
+        with self.connection() as conn:
+            cur = conn.cursor()
+            for table in LOOKUP_TABLES:
+                cur.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id SERIAL PRIMARY KEY,
+                        label TEXT UNIQUE NOT NULL,
+                        display_label TEXT,
+                        sort_order INTEGER NOT NULL DEFAULT 0,
+                        active BOOLEAN NOT NULL DEFAULT TRUE
+                    )
+                ''')
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS contacts (
+                    id BIGSERIAL PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    phone TEXT,
+                    genre_id INTEGER NOT NULL REFERENCES genres (id),
+                    user_type_id INTEGER NOT NULL REFERENCES user_types (id),
+                    message TEXT NOT NULL,
+                    created_at TIMESTAMPTZ
+                )
+            ''')
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS admin_users (
+                    id BIGSERIAL PRIMARY KEY,
+                    username TEXT UNIQUE NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    security_question TEXT NOT NULL,
+                    security_answer_hash TEXT NOT NULL,
+                    created_at TIMESTAMPTZ
+                )
+            ''')
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS password_reset_tokens (
+                    id BIGSERIAL PRIMARY KEY,
+                    user_id BIGINT NOT NULL REFERENCES admin_users (id),
+                    token TEXT UNIQUE NOT NULL,
+                    expires_at TIMESTAMPTZ NOT NULL,
+                    used BOOLEAN DEFAULT FALSE,
+                    created_at TIMESTAMPTZ
+                )
+            ''')
+            # contacts への変更のたびにトリガーで加算するカウンタ（change_marker 用）
+            cur.execute('''
+                CREATE TABLE IF NOT EXISTS contacts_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version BIGINT NOT NULL DEFAULT 0
+                )
+            ''')
+            cur.execute('INSERT INTO contacts_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING')
+            cur.execute('''
+                CREATE OR REPLACE FUNCTION bump_contacts_version() RETURNS trigger AS $$
+                BEGIN
+                    UPDATE contacts_version SET version = version + 1 WHERE id = 1;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+            ''')
+            cur.execute('DROP TRIGGER IF EXISTS contacts_version_bump ON contacts')
+            cur.execute('''
+                CREATE TRIGGER contacts_version_bump
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON contacts
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_contacts_version()
+            ''')
+
+    def is_initialized(self) -> bool:
+        count = self._scalar(
+            '''SELECT COUNT(*) FROM information_schema.tables
+               WHERE table_schema = current_schema()
+                 AND table_name IN ('contacts', 'admin_users', 'password_reset_tokens', 'genres', 'user_types',
+                                    'contacts_version')'''
+        )
+        return count == 6
+
+    def _contact_columns(self) -> set[str]:
+        rows = self._fetchall(
+            "SELECT column_name FROM information_schema.columns"
+            " WHERE table_schema = current_schema() AND table_name = 'contacts'"
+        )
+        return {row['column_name'] for row in rows}
+
+    def count_contacts_in_month(self, month: str) -> int:
+        return self._scalar(
+            "SELECT COUNT(*) FROM contacts WHERE to_char(created_at AT TIME ZONE 'Asia/Tokyo', 'YYYY-MM') = ?",
+            (month,)
+        )
+
+    def change_marker(self) -> Hashable:
+        # PostgreSQLには data_version 相当がないため、トリガーで加算するカウンタ行を主キーで読む
+        # （contacts を走査しないが、SQLiteと違ってサーバーへの往復は1回発生する）
+        return self._scalar('SELECT version FROM contacts_version WHERE id = 1')
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+
+
+def create_storage(database_url: Optional[str], sqlite_path: str) -> Storage:
+    """DATABASE_URL が postgres:// 形式ならPostgreSQL、それ以外はSQLiteを使う"""
+    if database_url and database_url.startswith(('postgres://', 'postgresql://')):
+        return PostgresStorage(
+            database_url,
+            min_connections=int(os.getenv('DB_POOL_MIN', '1')),
+            max_connections=int(os.getenv('DB_POOL_MAX', '10'))
+        )
+    return SQLiteStorage(sqlite_path)
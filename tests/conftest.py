@@ -0,0 +1,44 @@
+"""
+テスト共通のフィクスチャ
+"""
+
+import pytest
+
+from storage import SQLiteStorage
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """app を一時ディレクトリで読み込む（.env の DATABASE_URL や本番用のDBには触れない）"""
+    with pytest.MonkeyPatch.context() as mp:
+        # load_dotenv() は設定済みの環境変数を上書きしない
+        mp.setenv('DATABASE_URL', '')
+        mp.setenv('FLASK_ENV', 'development')
+        mp.setenv('WEBSITE_SITE_NAME', '')
+        mp.chdir(tmp_path_factory.mktemp('app'))
+        import app
+    app.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app
+
+@pytest.fixture
+def perch(app_module, tmp_path, monkeypatch):
+    """一時SQLiteデータベースに差し替え、初期化済みの app モジュール"""
+    storage = SQLiteStorage(str(tmp_path / 'perch.db'))
+    monkeypatch.setattr(app_module, 'storage', storage)
+    monkeypatch.setattr(app_module, 'genre_lookup', app_module.LookupCache(storage, 'genres', 60, 5))
+    monkeypatch.setattr(app_module, 'user_type_lookup', app_module.LookupCache(storage, 'user_types', 60, 5))
+    monkeypatch.setattr(app_module, 'contact_read_model', app_module.ContactReadModel(storage, 3))
+    monkeypatch.setattr(app_module, 'READ_MODEL_WINDOW', 3)
+    monkeypatch.setattr(app_module, '_readiness', {'checked_at': None, 'ready': False})
+    monkeypatch.setattr(app_module, '_warmed_pid', None)
+    app_module.init_db()
+    yield app_module
+    storage.release()
+    storage.close()
+
+@pytest.fixture
+def admin_client(perch):
+    client = perch.app.test_client()
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+        sess['username'] = perch.DEFAULT_ADMIN_USERNAME
+    return client
@@ -0,0 +1,55 @@
+"""
+レスポンス圧縮ミドルウェアのテスト
+"""
+
+import gzip
+
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from compression import CompressionMiddleware
+
+LARGE_BODY = 'お問い合わせ一覧 ' * 200
+
+def _client(body, mimetype='text/html', headers=None, min_size=500):
+    def app(environ, start_response):
+        return Response(body, mimetype=mimetype, headers=headers)(environ, start_response)
+    return Client(CompressionMiddleware(app, min_size=min_size))
+
+def test_compresses_large_html_with_gzip():
+    response = _client(LARGE_BODY).get('/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.get_data()).decode() == LARGE_BODY
+
+def test_skips_already_compressed_types():
+    response = _client(b'\xff\xd8' * 1000, mimetype='image/jpeg').get('/', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Vary' not in response.headers
+
+@pytest.mark.parametrize('body, method, accept_encoding', [
+    (LARGE_BODY, 'GET', None),
+    (LARGE_BODY, 'GET', 'identity'),
+    (LARGE_BODY, 'HEAD', 'gzip'),
+    ('short', 'GET', 'gzip'),
+])
+def test_adds_vary_when_sent_uncompressed(body, method, accept_encoding):
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    response = _client(body).open('/', method=method, headers=headers)
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+def test_merges_existing_vary_header():
+    client = _client(LARGE_BODY, headers={'Vary': 'Cookie'})
+    for accept_encoding in ('gzip', 'identity'):
+        response = client.get('/', headers={'Accept-Encoding': accept_encoding})
+        assert response.headers.getlist('Vary') == ['Cookie, Accept-Encoding']
+
+def test_streaming_response_is_compressed():
+    chunks = [f'line {i}\n' * 20 for i in range(20)]
+    client = _client(iter(chunks), mimetype='text/plain')
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.get_data()).decode() == ''.join(chunks)
@@ -0,0 +1,73 @@
+"""
+ヘルスチェック（/healthz・/readyz）とウォームアップのテスト
+"""
+
+import pytest
+
+@pytest.fixture
+def client(perch):
+    return perch.app.test_client()
+
+@pytest.fixture
+def storage_down(perch, monkeypatch):
+    """データベースに接続できない状態にする"""
+    def unavailable():
+        raise RuntimeError('connection refused')
+    monkeypatch.setattr(perch.storage, 'is_initialized', unavailable)
+
+def test_healthz_does_no_io(perch, client, monkeypatch):
+    def forbidden(*args, **kwargs):
+        raise AssertionError('healthz must not touch storage')
+    for name in ('connection', 'change_marker', 'is_initialized'):
+        monkeypatch.setattr(perch.storage, name, forbidden)
+    response = client.get('/healthz')
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == 'ok'
+    assert response.headers['Cache-Control'] == 'no-store'
+
+def test_readyz_warms_up_and_reports_ready(perch, client):
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.json == {'status': 'ready'}
+    assert perch._warmed_pid is not None
+
+def test_readyz_not_ready_when_storage_fails(perch, client, storage_down):
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.json == {'status': 'not_ready'}
+
+def test_readyz_caches_the_database_check(perch, client, monkeypatch):
+    assert client.get('/readyz').status_code == 200
+    def unavailable():
+        raise RuntimeError('connection refused')
+    monkeypatch.setattr(perch.storage, 'is_initialized', unavailable)
+    assert client.get('/readyz').status_code == 200
+    # キャッシュが切れると再確認して503を返す
+    monkeypatch.setitem(perch._readiness, 'checked_at', perch._readiness['checked_at'] - perch.READINESS_CACHE_SECONDS)
+    assert client.get('/readyz').status_code == 503
+
+def test_readyz_reports_failed_warm_up(perch, client, monkeypatch):
+    monkeypatch.setattr(perch, 'WARMUP_PATHS', ('/', '/no-such-page'))
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.json == {'status': 'warming_up'}
+    assert perch._warmed_pid is None
+
+def test_warm_up_runs_once_per_process(perch, monkeypatch):
+    calls = []
+    original = perch.contact_read_model.list_contacts
+    def recorder():
+        calls.append(1)
+        return original()
+    monkeypatch.setattr(perch.contact_read_model, 'list_contacts', recorder)
+    perch.warm_up()
+    perch.warm_up()
+    assert len(calls) == 1
+    # fork 後の別プロセスでは再度ウォームアップする
+    monkeypatch.setattr(perch, '_warmed_pid', -1)
+    perch.warm_up()
+    assert len(calls) == 2
+
+def test_readyz_not_ready_until_lookups_are_migrated(perch, client, monkeypatch):
+    monkeypatch.setattr(perch.storage, 'lookups_migrated', lambda: False)
+    assert client.get('/readyz').status_code == 503
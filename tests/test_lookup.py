@@ -0,0 +1,94 @@
+"""
+ルックアップテーブルのキャッシュ（LookupCache）とお問い合わせフォームの選択肢のテスト
+"""
+
+import pytest
+
+@pytest.fixture
+def clock(perch, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(perch.time, 'monotonic', lambda: now[0])
+    return now
+
+@pytest.fixture
+def loads(perch, monkeypatch):
+    calls = []
+    original = perch.storage.list_lookup
+    def recorder(table):
+        calls.append(table)
+        return original(table)
+    monkeypatch.setattr(perch.storage, 'list_lookup', recorder)
+    return calls
+
+@pytest.fixture
+def cache(perch):
+    return perch.LookupCache(perch.storage, 'genres', ttl=60, miss_interval=5)
+
+def _add_legacy_label(perch, label):
+    perch.storage._execute('INSERT INTO genres (label, sort_order, active) VALUES (?, 1000, FALSE)', (label,))
+    return perch.storage._scalar('SELECT id FROM genres WHERE label = ?', (label,))
+
+def test_options_use_display_labels(perch, cache):
+    assert cache.options() == perch.DEFAULT_GENRES
+
+def test_reloads_after_ttl(perch, cache, clock, loads):
+    cache.options()
+    perch.storage.add_lookup_labels('genres', [('新商品について', '新商品')])
+    clock[0] += 59
+    assert ('新商品について', '新商品') not in cache.options()
+    clock[0] += 1
+    assert ('新商品について', '新商品') in cache.options()
+    assert len(loads) == 2
+
+def test_miss_reload_is_rate_limited(perch, cache, clock, loads):
+    cache.options()
+    for _ in range(10):
+        assert cache.id_for('unknown') is None
+        assert cache.label(999) is None
+    assert len(loads) == 1
+    clock[0] += 5
+    perch.storage.add_lookup_labels('genres', [('新商品について', '新商品')])
+    assert cache.id_for('新商品について') is not None
+    assert len(loads) == 2
+
+def test_inactive_labels_resolve_by_id_only(perch, cache, clock):
+    legacy_id = _add_legacy_label(perch, 'custom')
+    clock[0] += 60
+    assert cache.label(legacy_id) == 'custom'
+    assert cache.id_for('custom') is None
+    assert 'custom' not in [label for label, _ in cache.options()]
+
+# --- お問い合わせフォーム ---
+def _post(perch, genre, user_type='はじめてのお客様'):
+    return perch.app.test_client().post('/access', data={
+        'name': '山田',
+        'email': 'yamada@example.com',
+        'tel': '',
+        'genre': genre,
+        'user-type': user_type,
+        'message': 'お問い合わせ内容',
+    })
+
+def test_form_shows_only_active_labels(perch):
+    _add_legacy_label(perch, 'custom')
+    html = perch.app.test_client().get('/access').get_data(as_text=True)
+    assert 'value="その他について"' in html
+    assert 'custom' not in html
+
+def test_form_saves_known_labels(perch):
+    response = _post(perch, '商品について')
+    assert response.status_code == 302
+    contact = perch.storage.list_contacts()[0]
+    assert (contact['genre'], contact['user_type']) == ('商品について', 'はじめてのお客様')
+
+@pytest.mark.parametrize('genre, user_type', [
+    ('unknown', 'はじめてのお客様'),
+    ('custom', 'はじめてのお客様'),
+    ('商品について', 'unknown'),
+])
+def test_form_rejects_unknown_or_inactive_labels(perch, genre, user_type):
+    _add_legacy_label(perch, 'custom')
+    response = _post(perch, genre, user_type)
+    assert response.status_code == 200
+    assert 'お問い合わせ種別またはお客様についての選択が正しくありません。' in response.get_data(as_text=True)
+    assert perch.storage.count_contacts() == 0
@@ -0,0 +1,130 @@
+"""
+管理画面用の読み取りモデル（ContactReadModel）のテスト
+一時SQLiteデータベース上で、変更検知・差分読み込み・保持件数・読み直しを確認する
+"""
+
+import datetime
+import sqlite3
+
+import pytest
+
+NOW = datetime.datetime(2026, 5, 15, 12, 0)
+
+@pytest.fixture
+def model(perch):
+    return perch.contact_read_model
+
+@pytest.fixture
+def reads(perch, monkeypatch):
+    """読み取りモデルが呼んだストレージの読み込みメソッドを記録する"""
+    calls = []
+    for name in ('recent_contacts', 'contacts_since', 'count_contacts'):
+        original = getattr(perch.storage, name)
+        def recorder(*args, _name=name, _original=original):
+            calls.append(_name)
+            return _original(*args)
+        monkeypatch.setattr(perch.storage, name, recorder)
+    return calls
+
+def _add(perch, count):
+    genre_id = perch.genre_lookup.id_for('商品について')
+    user_type_id = perch.user_type_lookup.id_for('お取引先様')
+    for i in range(count):
+        perch.storage.add_contact(f'user{i}', f'user{i}@example.com', '', genre_id, user_type_id, 'm', NOW)
+
+def _ids(model):
+    contacts, _ = model.list_contacts()
+    return [c.id for c in contacts]
+
+def test_lists_newest_first_with_total(perch, model):
+    _add(perch, 2)
+    contacts, total = model.list_contacts()
+    assert [c.id for c in contacts] == [2, 1]
+    assert total == 2
+    assert contacts[0].genre == '商品について'
+    assert contacts[0].to_dict()['user_type'] == 'お取引先様'
+
+def test_unchanged_data_is_not_reread(perch, model, reads):
+    _add(perch, 2)
+    model.list_contacts()
+    reads.clear()
+    model.list_contacts()
+    model.get_contact(1)
+    assert reads == []
+
+def test_new_rows_are_read_incrementally(perch, model, reads):
+    _add(perch, 2)
+    model.list_contacts()
+    reads.clear()
+    _add(perch, 1)
+    assert _ids(model) == [3, 2, 1]
+    assert 'contacts_since' in reads and 'recent_contacts' not in reads
+
+def test_detects_commits_from_other_connections(perch, model):
+    _add(perch, 1)
+    assert _ids(model) == [1]
+    # 別ワーカーのコミットは PRAGMA data_version の変化で検知する
+    other = sqlite3.connect(perch.storage.database)
+    with other:
+        other.execute(
+            '''INSERT INTO contacts (name, email, phone, genre_id, user_type_id, message, created_at)
+               SELECT name, email, phone, genre_id, user_type_id, message, created_at FROM contacts'''
+        )
+    other.close()
+    assert _ids(model) == [2, 1]
+
+def test_keeps_only_the_window(perch, model):
+    _add(perch, 2)
+    model.list_contacts()
+    _add(perch, 3)
+    contacts, total = model.list_contacts()
+    assert [c.id for c in contacts] == [5, 4, 3]
+    assert total == 5
+    assert 1 not in model._by_id
+
+def test_get_contact_falls_back_to_storage_outside_window(perch, model):
+    _add(perch, 5)
+    assert model.get_contact(5).name == 'user4'
+    older = model.get_contact(1)
+    assert older['name'] == 'user0'
+    assert older['genre'] == '商品について'
+    assert model.get_contact(99) is None
+
+def test_reloads_after_delete(perch, model, reads):
+    _add(perch, 3)
+    model.list_contacts()
+    perch.storage._execute('DELETE FROM contacts WHERE id = 2')
+    _add(perch, 1)
+    reads.clear()
+    contacts, total = model.list_contacts()
+    assert [c.id for c in contacts] == [4, 3, 1]
+    assert total == 3
+    assert 'recent_contacts' in reads
+
+def test_reloads_after_fork(perch, model, reads):
+    _add(perch, 2)
+    model.list_contacts()
+    reads.clear()
+    # fork 後のワーカーでは親プロセスの内容を使わない
+    model._pid = -1
+    assert _ids(model) == [2, 1]
+    assert 'recent_contacts' in reads
+
+# --- 管理画面の一覧（保持範囲より古いページ） ---
+def test_admin_api_pages_older_contacts(perch, admin_client):
+    _add(perch, 5)
+    response = admin_client.get('/admin/api/contacts')
+    assert [c['id'] for c in response.json] == [5, 4, 3]
+    assert response.headers['X-Total-Count'] == '5'
+    assert response.headers['Link'] == '</admin/api/contacts?before=3>; rel="next"'
+
+    response = admin_client.get('/admin/api/contacts?before=3')
+    assert [c['id'] for c in response.json] == [2, 1]
+    assert response.json[0]['genre'] == '商品について'
+    assert 'Link' not in response.headers
+
+def test_admin_list_shows_total_and_older_link(perch, admin_client):
+    _add(perch, 5)
+    html = admin_client.get('/admin/contacts').get_data(as_text=True)
+    assert '全5件中 3件を表示' in html
+    assert '/admin/contacts?before=3' in html
@@ -0,0 +1,254 @@
+"""
+ストレージ層の共通テスト
+同じテストをSQLiteとPostgreSQLの両方で実行する
+（PostgreSQLは TEST_DATABASE_URL が設定されている場合のみ）
+"""
+
+import datetime
+import os
+
+import pytest
+
+from storage import PostgresStorage, SQLiteStorage, Storage
+
+JST = datetime.timezone(datetime.timedelta(hours=9))
+BASE_TIME = datetime.datetime(2026, 5, 15, 12, 0, tzinfo=JST)
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def storage(request, tmp_path):
+    if request.param == 'sqlite':
+        backend = SQLiteStorage(str(tmp_path / 'test.db'))
+    else:
+        url = os.environ.get('TEST_DATABASE_URL')
+        if not url:
+            pytest.skip('TEST_DATABASE_URL が設定されていません')
+        backend = PostgresStorage(url, min_connections=1, max_connections=2)
+        with backend.connection() as conn:
+            conn.cursor().execute(
+                'DROP TABLE IF EXISTS password_reset_tokens, admin_users, contacts, contacts_version, genres, user_types CASCADE'
+            )
+    backend.init_schema()
+    backend.add_lookup_labels('genres', [('ご商談について', 'ご商談について'), ('商品について', '商品')])
+    backend.add_lookup_labels('user_types', [('はじめてのお客様', 'はじめてのお客様'), ('お取引先様', 'お取引先様')])
+    yield backend
+    backend.release()
+    backend.close()
+
+def _lookup_id(storage, table, label):
+    return {value: id_ for id_, value, _, _ in storage.list_lookup(table)}[label]
+
+def _add_contact(storage, name, created_at=BASE_TIME, genre='ご商談について', user_type='はじめてのお客様'):
+    storage.add_contact(
+        name, f'{name}@example.com', '090-0000-0000',
+        _lookup_id(storage, 'genres', genre), _lookup_id(storage, 'user_types', user_type),
+        'お問い合わせ内容', created_at
+    )
+
+def _add_admin(storage, username='admin', email='admin@example.com'):
+    storage.create_admin_user(username, 'hash', email, '質問', 'answer-hash', BASE_TIME)
+    return storage.get_admin_user(username)
+
+# --- スキーマ ---
+def test_init_schema_is_idempotent(storage):
+    assert storage.is_initialized()
+    storage.init_schema()
+    assert storage.is_initialized()
+    assert storage.count_contacts() == 0
+
+def test_incomplete_backend_cannot_be_created():
+    class IncompleteStorage(Storage):
+        def init_schema(self):
+            pass
+    with pytest.raises(TypeError):
+        IncompleteStorage()
+
+# --- ルックアップテーブル ---
+def test_list_lookup_returns_labels_in_sort_order(storage):
+    rows = [(label, display, active) for _, label, display, active in storage.list_lookup('genres')]
+    assert rows == [('ご商談について', 'ご商談について', True), ('商品について', '商品', True)]
+
+def test_add_lookup_labels_ignores_existing(storage):
+    storage.add_lookup_labels('genres', [('商品について', '別名'), ('その他について', 'その他')])
+    rows = [(label, display) for _, label, display, _ in storage.list_lookup('genres')]
+    assert rows == [('ご商談について', 'ご商談について'), ('商品について', '商品'), ('その他について', 'その他')]
+
+def test_lookup_rejects_unknown_table(storage):
+    with pytest.raises(ValueError):
+        storage.list_lookup('contacts')
+    with pytest.raises(ValueError):
+        storage.add_lookup_labels('contacts', [('x', 'x')])
+
+# --- お問い合わせ ---
+def test_add_and_get_contact(storage):
+    _add_contact(storage, 'yamada', genre='商品について', user_type='お取引先様')
+    contact = storage.list_contacts()[0]
+    fetched = storage.get_contact(contact['id'])
+    assert fetched['name'] == 'yamada'
+    assert fetched['email'] == 'yamada@example.com'
+    assert fetched['genre'] == '商品について'
+    assert fetched['user_type'] == 'お取引先様'
+    assert storage.get_contact(contact['id'] + 100) is None
+
+def test_list_contacts_newest_first(storage):
+    for i in range(3):
+        _add_contact(storage, f'user{i}', BASE_TIME + datetime.timedelta(hours=i))
+    assert [c['name'] for c in storage.list_contacts()] == ['user2', 'user1', 'user0']
+
+def test_contacts_since_and_recent(storage):
+    for i in range(5):
+        _add_contact(storage, f'user{i}')
+    ids = [c['id'] for c in storage.contacts_since(0)]
+    assert ids == sorted(ids) and len(ids) == 5
+    assert [c['id'] for c in storage.contacts_since(ids[2])] == ids[3:]
+    assert [c['id'] for c in storage.recent_contacts(2)] == ids[3:]
+
+def test_contacts_before(storage):
+    for i in range(5):
+        _add_contact(storage, f'user{i}', genre='商品について')
+    ids = [c['id'] for c in storage.contacts_since(0)]
+    older = storage.contacts_before(ids[3], 2)
+    assert [c['id'] for c in older] == [ids[2], ids[1]]
+    assert older[0]['genre'] == '商品について'
+    assert storage.contacts_before(ids[0], 2) == []
+
+def test_count_contacts(storage):
+    assert storage.count_contacts() == 0
+    _add_contact(storage, 'a')
+    _add_contact(storage, 'b')
+    assert storage.count_contacts() == 2
+
+def test_count_contacts_in_month(storage):
+    _add_contact(storage, 'may1', BASE_TIME)
+    _add_contact(storage, 'may2', BASE_TIME + datetime.timedelta(days=3))
+    _add_contact(storage, 'june', BASE_TIME + datetime.timedelta(days=30))
+    assert storage.count_contacts_in_month('2026-05') == 2
+    assert storage.count_contacts_in_month('2026-06') == 1
+    assert storage.count_contacts_in_month('2026-07') == 0
+
+def test_count_contacts_by(storage):
+    _add_contact(storage, 'a', genre='ご商談について')
+    _add_contact(storage, 'b', genre='商品について')
+    _add_contact(storage, 'c', genre='商品について', user_type='お取引先様')
+    genre_counts = dict(storage.count_contacts_by('genre_id'))
+    assert genre_counts == {
+        _lookup_id(storage, 'genres', 'ご商談について'): 1,
+        _lookup_id(storage, 'genres', '商品について'): 2,
+    }
+    user_type_counts = dict(storage.count_contacts_by('user_type_id'))
+    assert user_type_counts[_lookup_id(storage, 'user_types', 'お取引先様')] == 1
+
+def test_count_contacts_by_rejects_unknown_column(storage):
+    with pytest.raises(ValueError):
+        storage.count_contacts_by('name')
+
+def test_change_marker_changes_after_insert_and_delete(storage):
+    before = storage.change_marker()
+    assert storage.change_marker() == before
+    _add_contact(storage, 'a')
+    inserted = storage.change_marker()
+    assert inserted != before
+    storage._execute('DELETE FROM contacts')
+    assert storage.change_marker() not in (before, inserted)
+
+# --- 管理者ユーザー ---
+def test_admin_users(storage):
+    assert storage.count_admin_users() == 0
+    user = _add_admin(storage)
+    assert storage.count_admin_users() == 1
+    assert user['email'] == 'admin@example.com'
+    assert storage.get_admin_user('nobody') is None
+    assert storage.find_admin_user('admin', 'admin@example.com')['id'] == user['id']
+    assert storage.find_admin_user('admin', 'other@example.com') is None
+
+def test_update_admin_password(storage):
+    user = _add_admin(storage)
+    storage.update_admin_password(user['id'], 'new-hash')
+    assert storage.get_admin_user('admin')['password_hash'] == 'new-hash'
+
+# --- パスワードリセットトークン ---
+def test_valid_reset_token(storage):
+    user = _add_admin(storage)
+    storage.create_reset_token(user['id'], 'token', BASE_TIME + datetime.timedelta(hours=24), BASE_TIME)
+    record = storage.get_valid_reset_token('token', BASE_TIME)
+    assert record['user_id'] == user['id']
+    assert record['username'] == 'admin'
+    assert storage.get_valid_reset_token('unknown', BASE_TIME) is None
+
+def test_expired_reset_token(storage):
+    user = _add_admin(storage)
+    storage.create_reset_token(user['id'], 'token', BASE_TIME + datetime.timedelta(hours=1), BASE_TIME)
+    assert storage.get_valid_reset_token('token', BASE_TIME + datetime.timedelta(hours=2)) is None
+
+def test_used_reset_token(storage):
+    user = _add_admin(storage)
+    storage.create_reset_token(user['id'], 'token', BASE_TIME + datetime.timedelta(hours=24), BASE_TIME)
+    record = storage.get_valid_reset_token('token', BASE_TIME)
+    storage.reset_password_with_token(record['id'], user['id'], 'reset-hash')
+    assert storage.get_admin_user('admin')['password_hash'] == 'reset-hash'
+    assert storage.get_valid_reset_token('token', BASE_TIME) is None
+
+def test_delete_expired_tokens(storage):
+    user = _add_admin(storage)
+    storage.create_reset_token(user['id'], 'old', BASE_TIME - datetime.timedelta(hours=1), BASE_TIME)
+    storage.create_reset_token(user['id'], 'new', BASE_TIME + datetime.timedelta(hours=1), BASE_TIME)
+    assert storage.delete_expired_tokens(BASE_TIME) == 1
+    assert storage.get_valid_reset_token('new', BASE_TIME) is not None
+
+# --- 旧形式からの移行 ---
+def _create_legacy_contacts(storage, rows):
+    """genre・user_type をテキスト列で持つ旧形式の contacts テーブルを作る"""
+    with storage.connection() as conn:
+        cur = storage._cursor(conn)
+        cur.execute('DROP TABLE contacts')
+        cur.execute('''
+            CREATE TABLE contacts (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL,
+                phone TEXT,
+                genre TEXT,
+                user_type TEXT,
+                message TEXT NOT NULL,
+                created_at TEXT
+            )
+        ''')
+        for id_, genre, user_type in rows:
+            cur.execute(
+                storage._sql(
+                    '''INSERT INTO contacts (id, name, email, phone, genre, user_type, message, created_at)
+                       VALUES (?, ?, ?, '', ?, ?, 'm', '2026-05-15 12:00:00')'''
+                ),
+                (id_, f'user{id_}', 'e@example.com', genre, user_type)
+            )
+
+def test_migration_keeps_legacy_labels_inactive(storage):
+    _create_legacy_contacts(storage, [
+        (1, 'ご商談について', 'はじめてのお客様'),
+        (2, 'custom', 'お取引先様'),
+        (3, '商品について', 'はじめてのお客様'),
+    ])
+    storage.migrate_contact_lookups(batch_size=2)
+
+    rows = storage.list_lookup('genres')
+    assert [(label, active) for _, label, _, active in rows] == [
+        ('ご商談について', True), ('商品について', True), ('custom', False)
+    ]
+    assert storage.get_contact(2)['genre'] == 'custom'
+    assert storage.get_contact(3)['genre'] == '商品について'
+    columns = storage._contact_columns()
+    assert 'genre' not in columns and 'user_type' not in columns
+
+def test_migration_assigns_placeholder_to_missing_labels(storage):
+    _create_legacy_contacts(storage, [
+        (1, 'ご商談について', 'はじめてのお客様'),
+        (2, None, 'はじめてのお客様'),
+    ])
+    assert not storage.lookups_migrated()
+    storage.migrate_contact_lookups()
+
+    assert storage.lookups_migrated()
+    assert storage.get_contact(1)['genre'] == 'ご商談について'
+    assert storage.get_contact(2)['genre'] == '未設定'
+    labels = {label: active for _, label, _, active in storage.list_lookup('genres')}
+    assert labels['未設定'] is False
+    assert '未設定' not in {label for _, label, _, _ in storage.list_lookup('user_types')}